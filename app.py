@@ -1,15 +1,25 @@
-import streamlit as st
-import sys
 import os
+import html
+import time
+from bisect import bisect_right
+import streamlit as st
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-from modules.query_analyzer import QueryAnalyzer
-from modules.research_module import ResearchModule
-from modules.validation_module import ValidationModule
-from modules.synthesis_module import SynthesisModule
 from utils.logger import logger
-from config import OPENAI_API_KEY
+from config import (
+    OPENAI_API_KEY, MAX_SOURCES, MAX_VALIDATION_WORKERS, LLM_DISK_CACHE_PATH,
+    ENABLE_LLM_VALIDATION, VALIDATION_BATCH_SIZE
+)
+from styles import APP_CSS
+
+# Credibility badge per score bucket: below 60, 60-79, 80 and above
+BADGE_THRESHOLDS = (60, 80)
+BADGES = ("🔴 Low Quality", "🟡 Medium Quality", "🟢 High Quality")
+
+# The streamed report preview is redrawn at most this often, or after this many new characters
+PREVIEW_REFRESH_SECONDS = 0.1
+PREVIEW_REFRESH_CHARS = 200
 
 # Page configuration
 st.set_page_config(
@@ -19,400 +29,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    /* ===== MAIN CONTAINER ===== */
-    .stApp {
-        background-color: #0d1117;
-        color: #e6edf3;
-    }
-    
-    /* ===== HEADERS - High Contrast ===== */
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #ffffff;  /* Pure white for main header */
-        text-align: center;
-        margin-bottom: 0.5rem;
-        text-shadow: 0 0 10px rgba(88, 166, 255, 0.3);
-    }
-    
-    .sub-header {
-        text-align: center;
-        color: #c9d1d9;  /* Lighter gray for better readability */
-        margin-bottom: 2rem;
-        font-size: 1.1rem;
-    }
-    
-    /* ===== MODULE STATUS BOXES ===== */
-    .module-status {
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-        background-color: #21262d;
-        border: 1px solid #30363d;
-    }
-    
-    .confidence-high {
-        background-color: #1a472a;  /* Darker green background */
-        border-left: 4px solid #2ea043;
-        color: #a5f3a5;  /* Brighter green text */
-        font-weight: 500;
-    }
-    
-    .confidence-medium {
-        background-color: #4d3800;  /* Darker yellow background */
-        border-left: 4px solid #d29922;
-        color: #ffdf6b;  /* Brighter yellow text */
-        font-weight: 500;
-    }
-    
-    .confidence-low {
-        background-color: #4c1f1f;  /* Darker red background */
-        border-left: 4px solid #f85149;
-        color: #ffa198;  /* Brighter red text */
-        font-weight: 500;
-    }
-    
-    /* ===== METRIC CARDS - Better Contrast ===== */
-    .metric-card {
-        background-color: #21262d;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        text-align: center;
-        border: 1px solid #30363d;
-    }
-    
-    /* ===== EXPANDERS - More Visible ===== */
-    .streamlit-expanderHeader {
-        background-color: #21262d !important;
-        border: 1px solid #444c56 !important;
-        color: #e6edf3 !important;
-        font-weight: 500 !important;
-    }
-    
-    .streamlit-expanderHeader:hover {
-        background-color: #30363d !important;
-        border-color: #58a6ff !important;
-    }
-    
-    /* ===== TEXT INPUTS - Better Visibility ===== */
-    .stTextInput > div > div > input,
-    .stTextArea > div > div > textarea {
-        background-color: #161b22;
-        color: #e6edf3;
-        border: 1px solid #444c56;
-        font-size: 1rem;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stTextArea > div > div > textarea:focus {
-        border-color: #58a6ff;
-        box-shadow: 0 0 0 1px #58a6ff;
-    }
-    
-    /* ===== BUTTONS - High Contrast ===== */
-    .stButton > button {
-        background-color: #238636;
-        color: #ffffff;
-        border: 1px solid #2ea043;
-        font-weight: 500;
-        font-size: 1rem;
-    }
-    
-    .stButton > button:hover {
-        background-color: #2ea043;
-        border: 1px solid #3fb950;
-        box-shadow: 0 0 10px rgba(46, 160, 67, 0.4);
-    }
-    
-    .stButton > button[kind="primary"] {
-        background-color: #1f6feb;
-        border-color: #58a6ff;
-    }
-    
-    .stButton > button[kind="primary"]:hover {
-        background-color: #58a6ff;
-        box-shadow: 0 0 10px rgba(88, 166, 255, 0.4);
-    }
-    
-    /* ===== SIDEBAR - Better Contrast ===== */
-    section[data-testid="stSidebar"] {
-        background-color: #0d1117;
-        border-right: 1px solid #30363d;
-    }
-    
-    section[data-testid="stSidebar"] .stMarkdown {
-        color: #e6edf3;
-    }
-    
-    section[data-testid="stSidebar"] h2,
-    section[data-testid="stSidebar"] h3 {
-        color: #ffffff;
-    }
-    
-    /* ===== ALERT BOXES - High Visibility ===== */
-    .stAlert {
-        background-color: #21262d;
-        border: 1px solid #444c56;
-        color: #e6edf3;
-    }
-    
-    .stSuccess {
-        background-color: #1a472a;
-        border-left: 4px solid #2ea043;
-        color: #a5f3a5;
-    }
-    
-    .stWarning {
-        background-color: #4d3800;
-        border-left: 4px solid #d29922;
-        color: #ffdf6b;
-    }
-    
-    .stError {
-        background-color: #4c1f1f;
-        border-left: 4px solid #f85149;
-        color: #ffa198;
-    }
-    
-    .stInfo {
-        background-color: #1c2d41;
-        border-left: 4px solid #58a6ff;
-        color: #79c0ff;
-    }
-    
-    /* ===== MARKDOWN CONTENT - Better Readability ===== */
-    .stMarkdown {
-        color: #e6edf3;
-    }
-    
-    .stMarkdown h1,
-    .stMarkdown h2,
-    .stMarkdown h3 {
-        color: #ffffff;
-        font-weight: 600;
-    }
-    
-    .stMarkdown p {
-        color: #e6edf3;
-        line-height: 1.6;
-    }
-    
-    .stMarkdown strong {
-        color: #ffffff;
-        font-weight: 600;
-    }
-    
-    /* ===== LINKS - Bright and Visible ===== */
-    a {
-        color: #58a6ff !important;
-        text-decoration: none;
-        font-weight: 500;
-    }
-    
-    a:hover {
-        color: #79c0ff !important;
-        text-decoration: underline;
-    }
-    
-    /* ===== PROGRESS BAR ===== */
-    .stProgress > div > div > div {
-        background-color: #2ea043;
-    }
-    
-    .stProgress > div > div {
-        background-color: #21262d;
-    }
-    
-    /* ===== METRICS - High Contrast ===== */
-    [data-testid="stMetricValue"] {
-        color: #58a6ff;
-        font-size: 2rem;
-        font-weight: 600;
-    }
-    
-    [data-testid="stMetricLabel"] {
-        color: #c9d1d9;
-        font-size: 1rem;
-        font-weight: 500;
-    }
-    
-    [data-testid="stMetricDelta"] {
-        color: #2ea043;
-    }
-    
-    /* ===== RADIO BUTTONS ===== */
-    .stRadio > label {
-        color: #e6edf3;
-        font-weight: 500;
-    }
-    
-    .stRadio div[role="radiogroup"] label {
-        color: #e6edf3;
-    }
-    
-    /* ===== CODE BLOCKS ===== */
-    code {
-        background-color: #161b22;
-        color: #ff7b72;
-        padding: 2px 6px;
-        border-radius: 3px;
-        border: 1px solid #30363d;
-        font-size: 0.9em;
-    }
-    
-    pre {
-        background-color: #161b22;
-        border: 1px solid #30363d;
-        border-radius: 6px;
-        padding: 1rem;
-    }
-    
-    /* ===== TABLES ===== */
-    table {
-        color: #e6edf3;
-        border-color: #30363d;
-    }
-    
-    thead tr {
-        background-color: #161b22;
-    }
-    
-    tbody tr:hover {
-        background-color: #21262d;
-    }
-    
-    /* ===== DIVIDERS ===== */
-    hr {
-        border-color: #30363d;
-    }
-    
-    /* ===== SCROLLBAR ===== */
-    ::-webkit-scrollbar {
-        width: 12px;
-        height: 12px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #0d1117;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: #30363d;
-        border-radius: 6px;
-        border: 2px solid #0d1117;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: #484f58;
-    }
-    
-    /* ===== CAPTIONS ===== */
-    .caption {
-        color: #8b949e;
-        font-size: 0.9rem;
-    }
-    
-    /* ===== SELECTBOX & MULTISELECT ===== */
-    .stSelectbox > div > div,
-    .stMultiSelect > div > div {
-        background-color: #161b22;
-        color: #e6edf3;
-        border: 1px solid #444c56;
-    }
-    
-    /* ===== NUMBER INPUT ===== */
-    .stNumberInput > div > div > input {
-        background-color: #161b22;
-        color: #e6edf3;
-        border: 1px solid #444c56;
-    }
-    
-    /* ===== DATE INPUT ===== */
-    .stDateInput > div > div > input {
-        background-color: #161b22;
-        color: #e6edf3;
-        border: 1px solid #444c56;
-    }
-    
-    /* ===== FILE UPLOADER ===== */
-    .stFileUploader {
-        background-color: #161b22;
-        border: 1px dashed #444c56;
-    }
-    
-    /* ===== TABS ===== */
-    .stTabs [data-baseweb="tab-list"] {
-        background-color: #161b22;
-        border-bottom: 1px solid #30363d;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        color: #8b949e;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        color: #58a6ff;
-        border-bottom-color: #58a6ff;
-    }
-    
-    /* ===== SPINNER ===== */
-    .stSpinner > div {
-        border-top-color: #58a6ff;
-    }
-    
-    /* ===== CUSTOM CLASSES ===== */
-    
-    /* Source badges */
-    .source-badge-high {
-        background-color: #1a472a;
-        color: #a5f3a5;
-        padding: 4px 8px;
-        border-radius: 4px;
-        font-size: 0.85rem;
-        font-weight: 500;
-    }
-    
-    .source-badge-medium {
-        background-color: #4d3800;
-        color: #ffdf6b;
-        padding: 4px 8px;
-        border-radius: 4px;
-        font-size: 0.85rem;
-        font-weight: 500;
-    }
-    
-    .source-badge-low {
-        background-color: #4c1f1f;
-        color: #ffa198;
-        padding: 4px 8px;
-        border-radius: 4px;
-        font-size: 0.85rem;
-        font-weight: 500;
-    }
-    
-    /* Make sure all text is readable */
-    * {
-        -webkit-font-smoothing: antialiased;
-        -moz-osx-font-smoothing: grayscale;
-    }
-    
-    /* Improve text contrast */
-    p, span, div, label {
-        color: #e6edf3;
-    }
-    
-    /* Headers in content */
-    h1 { color: #ffffff; font-weight: 600; }
-    h2 { color: #ffffff; font-weight: 600; }
-    h3 { color: #ffffff; font-weight: 600; }
-    h4 { color: #e6edf3; font-weight: 600; }
-    h5 { color: #e6edf3; font-weight: 500; }
-    h6 { color: #c9d1d9; font-weight: 500; }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS (Streamlit rebuilds the page on every rerun, so it is re-sent each time)
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -423,6 +41,20 @@ def initialize_session_state():
     if 'query_analysis' not in st.session_state:
         st.session_state.query_analysis = None
 
+@st.cache_resource(show_spinner=False)
+def init_llm_cache():
+    """
+    Persist LLM responses on disk so identical prompts skip the API across sessions.
+    Models with their own TTL cache (query analysis, validation) opt out.
+    """
+    if not LLM_DISK_CACHE_PATH:
+        return
+    from langchain.globals import set_llm_cache
+    from langchain_community.cache import SQLiteCache
+    
+    os.makedirs(os.path.dirname(LLM_DISK_CACHE_PATH) or ".", exist_ok=True)
+    set_llm_cache(SQLiteCache(database_path=LLM_DISK_CACHE_PATH))
+
 def check_api_key():
     """Check if OpenAI API key is configured"""
     if not OPENAI_API_KEY:
@@ -457,24 +89,34 @@ def display_module_info():
             st.markdown("### 📝 Synthesis Module")
             st.write("Generates comprehensive research reports")
 
+@st.cache_resource(show_spinner=False)
+def get_modules():
+    """
+    Build the pipeline modules once per process and reuse them across reruns.
+    Imported here so langchain, openai and faiss load on the first research run,
+    not while the UI first renders.
+    """
+    from modules.query_analyzer import QueryAnalyzer
+    from modules.research_module import ResearchModule
+    from modules.validation_module import ValidationModule
+    from modules.synthesis_module import SynthesisModule
+    
+    init_llm_cache()
+    return QueryAnalyzer(), ResearchModule(), ValidationModule(), SynthesisModule()
+
 def run_research(query: str, mode: str, user_urls: list = None):
     """Execute the multi modular research pipeline"""
     logger.clear_logs()
+    status = None
     
     try:
-        # Initialize modules
-        query_analyzer = QueryAnalyzer()
-        research_module = ResearchModule()
-        validation_module = ValidationModule()
-        synthesis_module = SynthesisModule()
+        # Shared module instances
+        query_analyzer, research_module, validation_module, synthesis_module = get_modules()
         
-        # Progress tracking
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        # Progress tracking: one status element whose label follows the pipeline stage
+        status = st.status("🔍 Analyzing your query...", expanded=False)
         
-        # Step 1: Query Analysis (20%)
-        status_text.text("🔍 Analyzing your query...")
-        progress_bar.progress(20)
+        # Step 1: Query Analysis
         query_analysis = query_analyzer.analyze(query)
         st.session_state.query_analysis = query_analysis
         
@@ -490,25 +132,59 @@ def run_research(query: str, mode: str, user_urls: list = None):
                 for topic in query_analysis.get("key_topics", []):
                     st.write(f"- {topic}")
         
-        # Step 2: Research (40%)
-        status_text.text("📰 Discovering and loading sources...")
-        progress_bar.progress(40)
-        
-        if mode == "autonomous" or not user_urls:
-            documents = research_module.search_and_load(query_analysis)
-        else:
-            documents = research_module.load_from_user_urls(user_urls)
+        # Step 2: Research; with LLM validation, each full batch is scored while the rest are still loading
+        status.update(label="📰 Discovering and loading sources...")
+        autonomous = mode == "autonomous" or not user_urls
         
-        if not documents:
-            st.error("❌ No sources could be loaded. Please try different URLs or query.")
-            return
+        # A run loads at most this many documents, so a larger batch would never fill during loading
+        flush_size = max(1, min(VALIDATION_BATCH_SIZE, MAX_SOURCES if autonomous else len(user_urls)))
         
-        st.success(f"✅ Loaded {len(documents)} sources successfully")
+        with ThreadPoolExecutor(max_workers=MAX_VALIDATION_WORKERS) as validation_pool:
+            batches = []  # (documents, future of their validation results)
+            pending = []
+            
+            def start_validation(doc):
+                pending.append(doc)
+                if len(pending) >= flush_size:
+                    batch = list(pending)
+                    batches.append((batch, validation_pool.submit(validation_module.validate_batch, batch)))
+                    pending.clear()
+            
+            on_document = start_validation if ENABLE_LLM_VALIDATION else None
+            if autonomous:
+                documents = research_module.search_and_load(query_analysis, on_document=on_document)
+            else:
+                documents = research_module.load_from_user_urls(user_urls, on_document=on_document)
+            
+            if not documents:
+                status.update(label="❌ No sources could be loaded", state="error")
+                st.error("❌ No sources could be loaded. Please try different URLs or query.")
+                return
+            
+            st.success(f"✅ Loaded {len(documents)} sources successfully")
+            
+            # Step 3: Validation
+            status.update(label="✅ Validating sources and checking credibility...")
+            if ENABLE_LLM_VALIDATION:
+                results_by_doc = {}
+                for batch, future in batches:
+                    results_by_doc.update(zip(map(id, batch), future.result()))
+                
+                # Documents not scored during loading go out together in one last batch
+                remaining = [doc for doc in documents if id(doc) not in results_by_doc]
+                if remaining:
+                    results_by_doc.update(zip(map(id, remaining), validation_module.validate_batch(remaining)))
+                
+                validation_results = [
+                    {**results_by_doc[id(doc)], "doc_index": idx} for idx, doc in enumerate(documents)
+                ]
+            else:
+                # Heuristic scoring is cheap, so it simply runs once everything is loaded
+                validation_results = [
+                    validation_module.validate_document(doc, idx) for idx, doc in enumerate(documents)
+                ]
         
-        # Step 3: Validation (60%)
-        status_text.text("✅ Validating sources and checking credibility...")
-        progress_bar.progress(60)
-        validation_report = validation_module.validate_documents(documents)
+        validation_report = validation_module.summarize(validation_results)
         
         # Display validation
         with st.expander("🔒 Validation Report", expanded=True):
@@ -524,26 +200,46 @@ def run_research(query: str, mode: str, user_urls: list = None):
             for note in validation_report.get("validation_notes", []):
                 st.info(note)
         
-        # Step 4: Synthesis (80%)
-        status_text.text("📝 Generating comprehensive report...")
-        progress_bar.progress(80)
+        # Step 4: Synthesis
+        status.update(label="📝 Generating comprehensive report...")
+        
+        # Show the report body as it is generated; the full report renders below once done
+        report_preview = st.empty()
+        streamed = []
+        preview = {"pending": 0, "drawn_at": time.monotonic()}
+        
+        def show_token(token: str):
+            streamed.append(token)
+            preview["pending"] += len(token)
+            # Redraw in steps rather than per token: each redraw resends the whole preview
+            now = time.monotonic()
+            if preview["pending"] >= PREVIEW_REFRESH_CHARS or now - preview["drawn_at"] >= PREVIEW_REFRESH_SECONDS:
+                report_preview.markdown("".join(streamed) + "▌")
+                preview["pending"] = 0
+                preview["drawn_at"] = now
+        
         report = synthesis_module.generate_report(
             query_analysis,
             documents,
             validation_report,
-            query
+            query,
+            on_token=show_token
         )
+        if preview["pending"]:
+            report_preview.markdown("".join(streamed))
+        report_preview.empty()
         st.session_state.report = report
         
-        # Complete (100%)
-        progress_bar.progress(100)
-        status_text.text("✅ Research complete!")
+        # Complete
+        status.update(label="✅ Research complete!", state="complete")
         st.session_state.research_complete = True
         
         # Display report
         # display_report(report)
         
     except Exception as e:
+        if status is not None:
+            status.update(label="❌ Research failed", state="error")
         st.error(f"❌ An error occurred: {str(e)}")
         st.exception(e)
 
@@ -552,28 +248,20 @@ def display_report(report: dict):
     st.markdown("---")
     st.markdown("## 📊 Research Report")
     
-    # Header with metadata
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("Company", report.get("company", "N/A"))
-        st.markdown('</div>', unsafe_allow_html=True)
-    with col2:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("Ticker", report.get("ticker", "N/A"))
-        st.markdown('</div>', unsafe_allow_html=True)
-    with col3:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        confidence = report.get("confidence_score", 0)
-        st.metric("Confidence", f"{confidence:.1f}%")
-        st.markdown('</div>', unsafe_allow_html=True)
-    with col4:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("Sources", report["metadata"].get("total_sources", 0))
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Confidence indicator
+    # Header with metadata and confidence indicator, rendered as one HTML block
     confidence = report.get("confidence_score", 0)
+    metrics = [
+        ("Company", report.get("company", "N/A")),
+        ("Ticker", report.get("ticker", "N/A")),
+        ("Confidence", f"{confidence:.1f}%"),
+        ("Sources", report["metadata"].get("total_sources", 0))
+    ]
+    metric_cards = "".join(
+        f'<div class="metric-card"><div class="metric-label">{label}</div>'
+        f'<div class="metric-value">{html.escape(str(value))}</div></div>'
+        for label, value in metrics
+    )
+    
     if confidence >= 75:
         css_class = "confidence-high"
         indicator = "🟢 High Confidence"
@@ -584,7 +272,11 @@ def display_report(report: dict):
         css_class = "confidence-low"
         indicator = "🔴 Low Confidence"
     
-    st.markdown(f'<div class="module-status {css_class}">{indicator}</div>', unsafe_allow_html=True)
+    st.markdown(
+        f'<div class="metrics-row">{metric_cards}</div>'
+        f'<div class="module-status {css_class}">{indicator}</div>',
+        unsafe_allow_html=True
+    )
     
     # Report content
     st.markdown("### 📄 Report Content")
@@ -605,62 +297,50 @@ def display_report(report: dict):
     sources = report.get("sources", [])
 
     if sources and len(sources) > 0:
-        st.markdown(f"**Analyzed {len(sources)} source(s):**")
-        st.markdown("")  # Add spacing
-        
+        # All sources go out as one HTML table instead of columns and captions per source
+        rows = []
         for source in sources:
             if isinstance(source, dict):
                 # Get source information
-                url = source.get('url', '#')
-                title = source.get('title', url)
+                url = html.escape(source.get('url', '#'), quote=True)
+                title = html.escape(str(source.get('title') or source.get('url', '#')))
                 index = source.get('index', '')
                 credibility = source.get('credibility_score')
-                is_trusted = source.get('is_trusted', False)
                 
-                # Create source display with credibility badge
+                badge = ""
                 if credibility and credibility != "N/A":
                     # Color code based on credibility
-                    if credibility >= 80:
-                        badge_color = "🟢"
-                        badge_text = f"High Quality ({credibility}/100)"
-                    elif credibility >= 60:
-                        badge_color = "🟡"
-                        badge_text = f"Medium Quality ({credibility}/100)"
-                    else:
-                        badge_color = "🔴"
-                        badge_text = f"Low Quality ({credibility}/100)"
-                    
-                    # Display with badge
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.markdown(f"**{index}.** [{title}]({url})")
-                    with col2:
-                        st.caption(f"{badge_color} {badge_text}")
-                        if is_trusted:
-                            st.caption("✅ Trusted Source")
-                else:
-                    # Display without credibility score
-                    st.markdown(f"**{index}.** [{title}]({url})")
-                
-                st.markdown("")  # Add spacing between sources
+                    badge = f"{BADGES[bisect_right(BADGE_THRESHOLDS, credibility)]} ({credibility}/100)"
+                    if source.get('is_trusted', False):
+                        badge += "<br>✅ Trusted Source"
                 
+                rows.append(
+                    f'<tr><td><b>{index}.</b> <a href="{url}" target="_blank">{title}</a></td>'
+                    f'<td class="source-badge">{badge}</td></tr>'
+                )
             elif isinstance(source, str):
                 # Source is just a URL string
-                st.markdown(f"- [{source}]({source})")
+                url = html.escape(source, quote=True)
+                rows.append(f'<tr><td><a href="{url}" target="_blank">{url}</a></td><td></td></tr>')
+        
+        st.markdown(
+            f"<p><b>Analyzed {len(sources)} source(s):</b></p>"
+            f'<table class="sources-table">{"".join(rows)}</table>',
+            unsafe_allow_html=True
+        )
     else:
         # Try to get sources from metadata as fallback
         metadata_sources = report.get("metadata", {}).get("sources_analyzed", [])
         if metadata_sources:
-            st.markdown(f"**Sources analyzed ({len(metadata_sources)}):**")
+            lines = []
             for idx, source_url in enumerate(metadata_sources, 1):
                 # Extract domain for display
                 try:
-                    from urllib.parse import urlparse
-                    parsed = urlparse(source_url)
-                    domain = parsed.netloc or "Unknown"
-                    st.markdown(f"{idx}. [{domain}]({source_url})")
+                    domain = urlparse(source_url).netloc or "Unknown"
                 except:
-                    st.markdown(f"{idx}. [{source_url}]({source_url})")
+                    domain = source_url
+                lines.append(f"{idx}. [{domain}]({source_url})")
+            st.markdown(f"**Sources analyzed ({len(metadata_sources)}):**\n\n" + "\n".join(lines))
         else:
             st.info("ℹ️ No source information available in this report")
     
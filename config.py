@@ -1,7 +1,10 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+# Read .env once per process; Streamlit reruns re-import config after code changes
+if not os.environ.get("_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_DOTENV_LOADED"] = "1"
 
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -16,9 +19,18 @@ MAX_TOKENS = 1000
 MAX_SOURCES = 5  # maximum number of URLs to analyze
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+EMBEDDING_BATCH_SIZE = 512  # texts per embeddings request
 
 # Vector Store
 VECTOR_STORE_PATH = "data/vector_store"
+PERSIST_VECTOR_STORES = True  # save each built store under VECTOR_STORE_PATH/<document-set hash>
+MAX_PERSISTED_VECTOR_STORES = 20  # least recently used stores beyond this are deleted after each save
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")  # "none" or "int8"
+QUANTIZATION_MIN_VECTORS = 256  # smaller stores stay full precision
+HNSW_MIN_VECTORS = 5000  # larger stores use an HNSW graph instead of exact search
+HNSW_M = 32  # graph neighbours per vector
+HNSW_EF_CONSTRUCTION = 64
+HNSW_EF_SEARCH = 32
 
 # Confidence Thresholds
 MIN_CONFIDENCE_SCORE = 0.6
@@ -28,8 +40,39 @@ HIGH_CONFIDENCE_THRESHOLD = 0.8
 MODULE_TIMEOUT = 30  # seconds
 URL_LOAD_TIMEOUT = 10  # seconds
 
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")  # info, success, warning or error
+MAX_LOG_ENTRIES = 200  # activity log entries kept per session
+
+# Caching
+QUERY_CACHE_SIZE = 256  # query analyses kept in memory
+QUERY_CACHE_TTL = 60 * 60  # seconds
+SERP_CACHE_SIZE = 256  # search result sets kept in memory
+SERP_CACHE_TTL = 15 * 60  # seconds
+PAGE_CACHE_SIZE = 128  # loaded pages kept in memory
+PAGE_CACHE_TTL = 60 * 60  # seconds
+PAGE_REVALIDATE_TTL = 24 * 60 * 60  # keep ETag/Last-Modified to revalidate expired pages
+LLM_CACHE_SIZE = 512  # LLM responses kept in memory (streamed, or without the disk cache)
+LLM_CACHE_TTL = 60 * 60  # seconds
+CACHE_REPORT_RESPONSES = True  # reuse reports for identical prompts (report model is not deterministic)
+QUERY_EMBEDDING_CACHE_SIZE = 256  # embedded questions kept in memory
+LLM_DISK_CACHE_PATH = os.getenv("LLM_DISK_CACHE_PATH", ".cache/llm_cache.db")  # report/Q&A calls; empty to disable
+
+# Document Loading
+MAX_FETCH_WORKERS = min(MAX_SOURCES, 8)  # concurrent URL fetches
+HOST_FETCH_DELAY = 1.0  # minimum seconds between requests to the same host
+MAX_PAGE_BYTES = 512 * 1024  # bytes downloaded per page
+MAX_PAGE_CHARS = 200_000  # characters of text kept per page
+MIN_PAGE_CHARS = 100  # pages with no more text than this count as failed loads
+
+# Validation
+ENABLE_LLM_VALIDATION = os.getenv("ENABLE_LLM_VALIDATION", "false").lower() == "true"  # LLM scoring instead of heuristics
+MAX_VALIDATION_WORKERS = 8  # concurrent LLM validation calls
+VALIDATION_BATCH_SIZE = 10  # documents scored per LLM call
+VALIDATION_CACHE_SIZE = 4096  # LLM credibility scores kept in memory
+
 # Financial News Sources (Prioritized for equity research)
-PRIORITY_DOMAINS = [
+PRIORITY_DOMAINS = (
     "reuters.com",
     "bloomberg.com",
     "wsj.com",
@@ -44,7 +87,7 @@ PRIORITY_DOMAINS = [
     "barrons.com",
     "forbes.com/investing",
     "morningstar.com"
-]
+)
 
 # Research Parameters
 ENABLE_WEB_SEARCH = True
@@ -52,4 +95,6 @@ MAX_SEARCH_RESULTS = 10
 
 USE_SERP_API = bool(SERPER_API_KEY)
 SERP_SEARCH_LIMIT = 7
-SERP_RESULTS_PER_QUERY = 3
\ No newline at end of file
+SERP_RESULTS_PER_QUERY = 3
+SERP_MAX_CONCURRENCY = 4  # parallel SERP requests
+SERP_QUERIES_PER_SECOND = 5  # rate limit across all SERP requests
\ No newline at end of file
@@ -1,14 +1,34 @@
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from typing import Dict, List
+from typing import Dict, List, Tuple
+from functools import lru_cache
 import json
 import re
-from config import LLM_MODEL, LLM_TEMPERATURE
+from config import LLM_MODEL, LLM_TEMPERATURE, QUERY_CACHE_SIZE, QUERY_CACHE_TTL
 from utils.logger import logger
+from utils.llm import get_chat_model
+from utils.cache import TTLCache
+
+# Raw LLM analyses keyed by normalized query text, shared by all instances and sessions
+ANALYSIS_CACHE = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+
+# Capitalized phrases such as "Apple", "Advanced Micro Devices" or "AT&T"
+COMPANY_NAME_RE = re.compile(r"\b[A-Z][\w&.\-]{2,}(?:\s+[A-Z][\w&.\-]+)*")
+
+# Built once at import and shared by every QueryAnalyzer
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Act as an expert financial analyst specializing in equity research.
+    Analyze the user's research query and extract structured information.
+    
+    Return a JSON object with:
+    - company_name: Primary company being researched
+    - ticker: Stock ticker if mentioned
+    - research_intent: Type of research (news, valuation, competition, earnings, outlook, etc.)
+    - key_topics: List of important topics to investigate
+    - time_frame: Time period of interest (recent, quarterly, annual, etc.)
+    - search_queries: List of 7-8 specific search queries to find relevant information
+    """),
+    ("user", "{query}")
+])
 
 class QueryAnalyzer:
     """
@@ -20,35 +40,9 @@ class QueryAnalyzer:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=LLM_MODEL, temperature=LLM_TEMPERATURE)
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """Act as an expert financial analyst specializing in equity research.
-            Analyze the user's research query and extract structured information.
-            
-            Return a JSON object with:
-            - company_name: Primary company being researched
-            - ticker: Stock ticker if mentioned
-            - research_intent: Type of research (news, valuation, competition, earnings, outlook, etc.)
-            - key_topics: List of important topics to investigate
-            - time_frame: Time period of interest (recent, quarterly, annual, etc.)
-            - search_queries: 7-8 specific search queries to find relevant information
-            
-            Example output:
-            {{
-                "company_name": "Tesla",
-                "ticker": "TSLA",
-                "research_intent": "earnings_analysis",
-                "key_topics": ["Q4 earnings", "delivery numbers", "profit margins"],
-                "time_frame": "recent",
-                "search_queries": [
-                    "Tesla Q4 2024 earnings report",
-                    "TSLA delivery numbers 2024",
-                    "Tesla profit margin analysis"
-                ]
-            }}
-            """),
-            ("user", "{query}")
-        ])
+        # ANALYSIS_CACHE (with its TTL and parse check) is the only cache for analyses
+        self.llm = get_chat_model(LLM_MODEL, LLM_TEMPERATURE, json_mode=True, cache=False)
+        self.prompt = ANALYSIS_PROMPT
     
     def analyze(self, query: str) -> Dict:
         """Analyze the query and return structured information"""
@@ -60,20 +54,16 @@ class QueryAnalyzer:
         )
         
         try:
-            # Generate analysis
-            chain = self.prompt | self.llm
-            response = chain.invoke({"query": query})
+            # Generate analysis (or reuse one for the same query)
+            cache_key = " ".join(query.lower().split())
+            content, from_cache = self._get_llm_response(query, cache_key)
             
-            # Parse JSON response
-            content = response.content
+            # JSON mode guarantees a bare JSON object; anything else falls back below
+            analysis = json.loads(content)
             
-            # Extract JSON from response (handle cases where LLM adds extra text)
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                # Fallback parsing
-                analysis = self._fallback_parse(query)
+            # Only responses that parse are reused, so a truncated reply is retried next time
+            if not from_cache:
+                ANALYSIS_CACHE.set(cache_key, content)
             
             # Validate and set defaults
             analysis = self._validate_analysis(analysis, query)
@@ -96,6 +86,21 @@ class QueryAnalyzer:
             )
             return self._fallback_parse(query)
     
+    def _get_llm_response(self, query: str, cache_key: str) -> Tuple[str, bool]:
+        """Return (raw LLM analysis, served_from_cache), reusing earlier responses for the same query"""
+        content = ANALYSIS_CACHE.get(cache_key)
+        if content is not None:
+            logger.log_activity(
+                "Query Analyzer",
+                "Using cached analysis",
+                "info",
+                "Same query analyzed earlier"
+            )
+            return content, True
+        
+        chain = self.prompt | self.llm
+        return chain.invoke({"query": query}).content, False
+    
     def _validate_analysis(self, analysis: Dict, original_query: str) -> Dict:
         """Validate and ensure all required fields exist"""
         defaults = {
@@ -125,10 +130,7 @@ class QueryAnalyzer:
     
     def _fallback_parse(self, query: str) -> Dict:
         """Simple fallback parser if LLM fails"""
-        # Extract potential company name (capitalize words)
-        words = query.split()
-        company_candidates = [w for w in words if w[0].isupper() and len(w) > 2]
-        company_name = ' '.join(company_candidates[:2]) if company_candidates else "Unknown Company"
+        company_name = extract_company_name(query)
         
         return {
             "company_name": company_name,
@@ -142,3 +144,9 @@ class QueryAnalyzer:
                 f"{company_name} earnings"
             ]
         }
+
+@lru_cache(maxsize=128)
+def extract_company_name(query: str) -> str:
+    """Pick the first capitalized phrase in the query as the company name"""
+    match = COMPANY_NAME_RE.search(query)
+    return match.group().rstrip(".-") if match else "Unknown Company"
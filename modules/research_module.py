@@ -1,30 +1,72 @@
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from urllib.parse import urlsplit
 from langchain_community.document_loaders import UnstructuredURLLoader
 from langchain_community.utilities import GoogleSerperAPIWrapper
 from langchain.schema import Document
+from bs4 import BeautifulSoup
 import requests
-import time
+from requests.adapters import HTTPAdapter
 
-from config import MAX_SOURCES, PRIORITY_DOMAINS, SERPER_API_KEY
+from config import (
+    MAX_SOURCES, SERPER_API_KEY, MAX_FETCH_WORKERS, HOST_FETCH_DELAY,
+    URL_LOAD_TIMEOUT, SERP_SEARCH_LIMIT, SERP_RESULTS_PER_QUERY, SERP_MAX_CONCURRENCY,
+    SERP_QUERIES_PER_SECOND, MAX_PAGE_BYTES, MAX_PAGE_CHARS, MIN_PAGE_CHARS, SERP_CACHE_SIZE, SERP_CACHE_TTL,
+    PAGE_CACHE_SIZE, PAGE_CACHE_TTL, PAGE_REVALIDATE_TTL
+)
 from utils.logger import logger
+from utils.cache import TTLCache
+from utils.rate_limiter import RateLimiter, HostRateLimiter
+from utils.urls import build_domain_index, domain_matches, canonicalize_url, PRIORITY_DOMAIN_INDEX
+
+# Social media, video and forum sites are never used as research sources
+EXCLUDED_DOMAINS = (
+    'youtube.com', 'twitter.com', 'facebook.com',
+    'instagram.com', 'reddit.com', 'pinterest.com'
+)
+
+# Built once at import so each URL is classified with a few dict lookups
+EXCLUDED_DOMAIN_INDEX = build_domain_index(EXCLUDED_DOMAINS)
+
+# Shared by all instances so the Serper plan's QPS is respected process-wide
+SERP_RATE_LIMITER = RateLimiter(SERP_QUERIES_PER_SECOND, period=1.0)
+HOST_RATE_LIMITER = HostRateLimiter(HOST_FETCH_DELAY)
+
+# Recent SERP results and page text, shared across instances and sessions
+SERP_CACHE = TTLCache(maxsize=SERP_CACHE_SIZE, ttl=SERP_CACHE_TTL)
+PAGE_CACHE = TTLCache(maxsize=PAGE_CACHE_SIZE, ttl=PAGE_CACHE_TTL)
+
+# (ETag, Last-Modified, page text) kept past PAGE_CACHE_TTL so expired pages can be
+# revalidated with a conditional request instead of downloaded again
+PAGE_VALIDATORS = TTLCache(maxsize=PAGE_CACHE_SIZE, ttl=PAGE_REVALIDATE_TTL)
+
+# Elements that never carry article text
+NON_CONTENT_TAGS = ["script", "style", "noscript", "svg", "iframe", "header", "footer", "nav", "form"]
+
+def create_http_session() -> requests.Session:
+    """Build the pooled HTTP session used for page fetches"""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    })
+    # Keep one pooled keep-alive connection per fetch worker
+    adapter = HTTPAdapter(pool_connections=MAX_FETCH_WORKERS, pool_maxsize=MAX_FETCH_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# One connection pool for every ResearchModule instance
+HTTP_SESSION = create_http_session()
 
 class ResearchModule:
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = HTTP_SESSION
         
         # Initialize Google SERP API
         try:
             if SERPER_API_KEY:
-                os.environ['SERPER_API_KEY'] = SERPER_API_KEY
-                self.search = GoogleSerperAPIWrapper()
+                self.search = GoogleSerperAPIWrapper(serper_api_key=SERPER_API_KEY)
                 self.serp_enabled = True
                 logger.log_activity(
                     "Research Module",
@@ -49,8 +91,17 @@ class ResearchModule:
                 str(e)
             )
     
-    def discover_sources(self, search_queries: List[str], company_name: str) -> List[str]:
-        """Discover URLs using Google SERP API or fallback"""
+    def discover_sources(
+        self,
+        search_queries: List[str],
+        company_name: str,
+        on_source_found: Optional[Callable[[str], None]] = None
+    ) -> List[str]:
+        """
+        Discover URLs using Google SERP API or fallback.
+        `on_source_found` is called as soon as a URL is certain to be selected,
+        so callers can start loading it before discovery finishes.
+        """
         logger.log_activity(
             "Research Module",
             "Discovering sources",
@@ -61,15 +112,14 @@ class ResearchModule:
         discovered_urls = []
         
         if self.serp_enabled:
-            urls = self._search_with_serp_api(search_queries, company_name)
+            urls = self._search_with_serp_api(search_queries, company_name, on_source_found)
             discovered_urls.extend(urls)
         else:
             urls = self._fallback_sources(company_name)
             discovered_urls.extend(urls)
         
-        # Filter and prioritize financial URLs
-        filtered_urls = self._filter_financial_urls(discovered_urls)
-        unique_urls = list(dict.fromkeys(filtered_urls))[:MAX_SOURCES]
+        # Filter and prioritize financial URLs (already deduplicated)
+        unique_urls = self._filter_financial_urls(discovered_urls)[:MAX_SOURCES]
         
         logger.log_activity(
             "Research Module",
@@ -80,9 +130,18 @@ class ResearchModule:
         
         return unique_urls
     
-    def _search_with_serp_api(self, queries: List[str], company_name: str) -> List[str]:
+    def _search_with_serp_api(
+        self,
+        queries: List[str],
+        company_name: str,
+        on_source_found: Optional[Callable[[str], None]] = None
+    ) -> List[str]:
         """Search using Google SERP API"""
         all_urls = []
+        seen = set()
+        # Priority URLs come first after filtering, so the first MAX_SOURCES
+        # of them (in query order) are guaranteed picks
+        early_picks = 0
         
         # Enhanced queries
         enhanced_queries = [
@@ -92,60 +151,92 @@ class ResearchModule:
             *queries[:4]
         ]
         
-        for query in enhanced_queries[:7]:
-            try:
-                logger.log_activity(
-                    "Research Module",
-                    "Searching Google",
-                    "info",
-                    query[:50] + "..."
-                )
-                
-                results = self.search.results(query)
-                
-                if 'organic' in results:
-                    for result in results['organic'][:3]:
-                        if 'link' in result:
-                            all_urls.append(result['link'])
-                
-                time.sleep(0.5)
-                
-            except Exception as e:
-                logger.log_activity(
-                    "Research Module",
-                    "Search error",
-                    "warning",
-                    str(e)[:50]
-                )
-                continue
+        queries_to_run = enhanced_queries[:SERP_SEARCH_LIMIT]
+        if logger.info_enabled:
+            logger.log_activities([
+                ("Research Module", "Searching Google", "info", query[:50] + "...")
+                for query in queries_to_run
+            ])
+        
+        with ThreadPoolExecutor(max_workers=SERP_MAX_CONCURRENCY) as executor:
+            futures = [executor.submit(self._run_search, query) for query in queries_to_run]
+            
+            # Reap in query order so earlier (broader) queries keep their ranking
+            for future in futures:
+                try:
+                    results = future.result()
+                    
+                    if 'organic' in results:
+                        for result in results['organic'][:SERP_RESULTS_PER_QUERY]:
+                            if 'link' in result:
+                                try:
+                                    url = canonicalize_url(result['link'])
+                                except ValueError:
+                                    # One malformed link must not drop the rest of this query's results
+                                    continue
+                                if url in seen:
+                                    continue
+                                seen.add(url)
+                                all_urls.append(url)
+                                
+                                if (on_source_found and early_picks < MAX_SOURCES
+                                        and self._classify_url(url) == "priority"):
+                                    early_picks += 1
+                                    on_source_found(url)
+                    
+                except Exception as e:
+                    logger.log_activity(
+                        "Research Module",
+                        "Search error",
+                        "warning",
+                        str(e)[:50]
+                    )
+                    continue
         
         return all_urls
     
+    def _run_search(self, query: str) -> Dict:
+        """Run one rate-limited SERP query (runs in a worker thread)"""
+        results = SERP_CACHE.get(query)
+        if results is None:
+            SERP_RATE_LIMITER.acquire()
+            results = self.search.results(query)
+            SERP_CACHE.set(query, results)
+        return results
+    
     def _filter_financial_urls(self, urls: List[str]) -> List[str]:
         """Filter for quality financial sources"""
         prioritized = []
         other_urls = []
+        seen = set()
         
         for url in urls:
-            url_lower = url.lower()
-            
-            # Exclude social media, videos, etc.
-            excluded = [
-                'youtube.com', 'twitter.com', 'facebook.com',
-                'instagram.com', 'reddit.com', 'pinterest.com'
-            ]
-            
-            if any(ex in url_lower for ex in excluded):
+            url = canonicalize_url(url)
+            if url in seen:
                 continue
+            seen.add(url)
             
-            # Prioritize trusted financial domains
-            if any(domain in url_lower for domain in PRIORITY_DOMAINS):
+            category = self._classify_url(url)
+            
+            # Prioritize trusted financial domains; drop social media, videos, etc.
+            if category == "priority":
                 prioritized.append(url)
-            else:
+            elif category == "other":
                 other_urls.append(url)
         
         return prioritized + other_urls
     
+    def _classify_url(self, url: str) -> str:
+        """Return "excluded", "priority" or "other" for a canonical URL"""
+        parsed = urlsplit(url)
+        host = parsed.hostname or ""
+        
+        if domain_matches(host, parsed.path, EXCLUDED_DOMAIN_INDEX):
+            return "excluded"
+        if domain_matches(host, parsed.path, PRIORITY_DOMAIN_INDEX):
+            return "priority"
+        return "other"
+    
     def _fallback_sources(self, company_name: str) -> List[str]:
         """Fallback when SERP API unavailable"""
         logger.log_activity(
@@ -163,8 +254,26 @@ class ResearchModule:
             "https://www.bloomberg.com/"
         ][:MAX_SOURCES]
     
-    def load_documents(self, urls: List[str]) -> List[Document]:
+    def load_documents(
+        self,
+        urls: List[str],
+        on_document: Optional[Callable[[Document], None]] = None
+    ) -> List[Document]:
         """Load content from URLs"""
+        with ThreadPoolExecutor(max_workers=max(1, min(len(urls), MAX_FETCH_WORKERS))) as executor:
+            futures = {url: executor.submit(self._load_url, url) for url in urls}
+            return self._collect_documents(urls, futures, on_document)
+    
+    def _collect_documents(
+        self,
+        urls: List[str],
+        futures: Dict[str, Future],
+        on_document: Optional[Callable[[Document], None]] = None
+    ) -> List[Document]:
+        """
+        Wait for submitted loads and return the documents in URL order.
+        `on_document` is called (on this thread) for each usable document as soon as it arrives.
+        """
         logger.log_activity(
             "Research Module",
             "Loading documents",
@@ -172,57 +281,163 @@ class ResearchModule:
             f"Processing {len(urls)} URLs"
         )
         
-        documents = []
-        successful_loads = 0
+        # Per-URL activity is buffered and written to the log once at the end
+        log_buffer = []
+        if logger.info_enabled:
+            log_buffer.extend(
+                ("Research Module", f"Loading {idx + 1}/{len(urls)}", "info", url[:60] + "...")
+                for idx, url in enumerate(urls)
+            )
+        results = {}
+        from_cache = set()
+        fallback = []
         
-        for idx, url in enumerate(urls):
+        pending = {futures[url]: url for url in urls}
+        for future in as_completed(pending):
+            url = pending[future]
             try:
-                logger.log_activity(
-                    "Research Module",
-                    f"Loading {idx + 1}/{len(urls)}",
-                    "info",
-                    url[:60] + "..."
-                )
-                
-                loader = UnstructuredURLLoader(
-                    urls=[url],
-                    continue_on_failure=True,
-                    headers={"User-Agent": "Mozilla/5.0"}
-                )
-                
-                docs = loader.load()
-                
-                if docs and len(docs[0].page_content) > 100:
-                    documents.extend(docs)
-                    successful_loads += 1
-                    logger.log_activity(
-                        "Research Module",
-                        "Loaded successfully",
-                        "success",
-                        f"{len(docs[0].page_content)} chars"
-                    )
-                
-                time.sleep(1)
-                
+                results[url], cached = future.result()
             except Exception as e:
-                logger.log_activity(
+                # Retried below with the heavier unstructured partitioner
+                fallback.append(url)
+                log_buffer.append((
                     "Research Module",
-                    "Load failed",
+                    "Direct load failed, will retry",
                     "warning",
                     str(e)[:50]
-                )
+                ))
                 continue
+            
+            if cached:
+                from_cache.add(url)
+                if logger.info_enabled:
+                    log_buffer.append(("Research Module", "Loaded from cache", "info", url[:60] + "..."))
+            
+            # Outside the try: a failing callback is the caller's error, not a failed fetch
+            if on_document and self._is_usable(results[url]):
+                for doc in results[url]:
+                    on_document(doc)
         
-        logger.log_activity(
+        if fallback:
+            results.update(self._load_with_unstructured(fallback))
+            if on_document:
+                for url in fallback:
+                    if self._is_usable(results.get(url)):
+                        for doc in results[url]:
+                            on_document(doc)
+        
+        # Keep documents in the original URL order regardless of completion order
+        documents = []
+        successful_loads = 0
+        for url in urls:
+            docs = results.get(url)
+            if self._is_usable(docs):
+                documents.extend(docs)
+                successful_loads += 1
+                if url not in from_cache:
+                    PAGE_CACHE.set(url, [(doc.page_content, dict(doc.metadata)) for doc in docs])
+                log_buffer.append((
+                    "Research Module",
+                    "Loaded successfully",
+                    "success",
+                    f"{len(docs[0].page_content)} chars"
+                ))
+        
+        log_buffer.append((
             "Research Module",
             "Loading complete",
             "success",
             f"{successful_loads}/{len(urls)} sources loaded"
-        )
+        ))
+        logger.log_activities(log_buffer)
         
         return documents
     
-    def load_from_user_urls(self, urls: List[str]) -> List[Document]:
+    def _is_usable(self, docs: Optional[List[Document]]) -> bool:
+        """A load counts only if it produced more than boilerplate"""
+        return bool(docs) and len(docs[0].page_content) > MIN_PAGE_CHARS
+    
+    def _load_url(self, url: str) -> Tuple[List[Document], bool]:
+        """Fetch a single URL or reuse a cached copy (runs in a worker thread, so no logging here)"""
+        cached = PAGE_CACHE.get(url)
+        if cached is not None:
+            return self._restore_documents(cached), True
+        
+        # Different hosts proceed in parallel; only same-host requests wait
+        HOST_RATE_LIMITER.acquire(urlsplit(url).hostname or "")
+        return self._fetch_html_document(url), False
+    
+    def _restore_documents(self, entries: List[Tuple[str, Dict]]) -> List[Document]:
+        """Rebuild documents from cached (text, metadata) pairs"""
+        return [Document(page_content=text, metadata=dict(meta)) for text, meta in entries]
+    
+    def _load_with_unstructured(self, urls: List[str]) -> Dict[str, List[Document]]:
+        """Load URLs the direct path could not handle, using one loader for all of them"""
+        docs_by_url = {url: [] for url in urls}
+        try:
+            loader = UnstructuredURLLoader(
+                urls=urls,
+                continue_on_failure=True,
+                headers={"User-Agent": "Mozilla/5.0"}
+            )
+            for doc in loader.load():
+                docs_by_url.setdefault(doc.metadata.get("source", ""), []).append(doc)
+        except Exception as e:
+            logger.log_activity(
+                "Research Module",
+                "Load failed",
+                "warning",
+                str(e)[:50]
+            )
+        return docs_by_url
+    
+    def _fetch_html_document(self, url: str) -> List[Document]:
+        """Download a page and keep only its visible text"""
+        # A previously seen page is only re-sent by the server if it changed
+        stale = PAGE_VALIDATORS.get(url)
+        headers = {}
+        if stale is not None:
+            etag, last_modified, _ = stale
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        # Stream so only the first MAX_PAGE_BYTES are downloaded and parsed
+        with self.session.get(url, timeout=URL_LOAD_TIMEOUT, stream=True, headers=headers) as response:
+            if response.status_code == 304 and stale is not None:
+                return self._restore_documents(stale[2])
+            response.raise_for_status()
+            html = response.raw.read(MAX_PAGE_BYTES, decode_content=True)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+        
+        soup = BeautifulSoup(html, "lxml")
+        for tag in soup(NON_CONTENT_TAGS):
+            tag.decompose()
+        
+        body = soup.body or soup
+        text = body.get_text("\n", strip=True)[:MAX_PAGE_CHARS]
+        
+        # A truncated download (e.g. a huge inline <head>) can leave almost no text;
+        # raising sends the URL to the unstructured fallback instead of accepting it
+        if len(text) <= MIN_PAGE_CHARS:
+            raise ValueError(f"Only {len(text)} characters of text extracted")
+        
+        metadata = {"source": url}
+        if soup.title and soup.title.string:
+            metadata["title"] = soup.title.string.strip()
+        
+        if etag or last_modified:
+            PAGE_VALIDATORS.set(url, (etag, last_modified, [(text, dict(metadata))]))
+        
+        return [Document(page_content=text, metadata=metadata)]
+    
+    def load_from_user_urls(
+        self,
+        urls: List[str],
+        on_document: Optional[Callable[[Document], None]] = None
+    ) -> List[Document]:
         """Load from user-provided URLs"""
         logger.log_activity(
             "Research Module",
@@ -231,7 +446,23 @@ class ResearchModule:
             f"{len(urls)} provided"
         )
         
-        valid_urls = [url.strip() for url in urls if url and url.strip()]
+        # Fetch each page once, however the user pasted it (tracking params, trailing slash, duplicates)
+        valid_urls = []
+        for url in urls:
+            if not url or not url.strip():
+                continue
+            try:
+                url = canonicalize_url(url)
+            except ValueError as e:
+                logger.log_activity(
+                    "Research Module",
+                    "Invalid URL skipped",
+                    "warning",
+                    f"{url[:50]}: {e}"
+                )
+                continue
+            if url not in valid_urls:
+                valid_urls.append(url)
         
         if not valid_urls:
             logger.log_activity(
@@ -242,15 +473,35 @@ class ResearchModule:
             )
             return []
         
-        return self.load_documents(valid_urls)
+        return self.load_documents(valid_urls, on_document)
     
-    def search_and_load(self, analysis: Dict) -> List[Document]:
-        """Main method: search and load"""
-        try:
-            urls = self.discover_sources(
-                analysis.get("search_queries", []),
-                analysis.get("company_name", "")
-            )
+    def search_and_load(
+        self,
+        analysis: Dict,
+        on_document: Optional[Callable[[Document], None]] = None
+    ) -> List[Document]:
+        """Main method: search and load (each loaded document is also passed to `on_document`)"""
+        # Loading overlaps discovery: guaranteed picks start fetching as soon as they are found
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            futures = {}
+            
+            def start_load(url: str):
+                futures[url] = executor.submit(self._load_url, url)
+            
+            try:
+                urls = self.discover_sources(
+                    analysis.get("search_queries", []),
+                    analysis.get("company_name", ""),
+                    on_source_found=start_load
+                )
+            except Exception as e:
+                logger.log_activity(
+                    "Research Module",
+                    "Research failed",
+                    "error",
+                    str(e)
+                )
+                return []
             
             if not urls:
                 logger.log_activity(
@@ -261,13 +512,10 @@ class ResearchModule:
                 )
                 return []
             
-            return self.load_documents(urls)
+            for url in urls:
+                if url not in futures:
+                    start_load(url)
             
-        except Exception as e:
-            logger.log_activity(
-                "Research Module",
-                "Research failed",
-                "error",
-                str(e)
-            )
-            return []
\ No newline at end of file
+            # Fetch failures are handled per URL inside; `on_document` errors reach the caller,
+            # as they do from load_from_user_urls
+            return self._collect_documents(urls, futures, on_document)
\ No newline at end of file
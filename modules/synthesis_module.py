@@ -1,18 +1,89 @@
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from typing import List, Dict
-from langchain_openai import ChatOpenAI
+import threading
+from typing import List, Dict, Tuple, Optional, Callable
+from functools import lru_cache
+from urllib.parse import urlparse
 from langchain.prompts import ChatPromptTemplate
+from langchain.globals import get_llm_cache
 from langchain.schema import Document
-from langchain.chains import RetrievalQA
 from datetime import datetime
 
-from config import LLM_MODEL, MAX_TOKENS
+from config import LLM_MODEL, MAX_TOKENS, LLM_CACHE_SIZE, LLM_CACHE_TTL, CACHE_REPORT_RESPONSES
 from utils.logger import logger
+from utils.llm import get_chat_model
+from utils.cache import TTLCache, make_cache_key
 from utils.embeddings import VectorStoreManager
 
+# LLM outputs keyed by model settings and the fully rendered prompt, for calls LangChain's
+# cache cannot serve: streamed ones, and every call when no global cache is installed
+RESPONSE_CACHE = TTLCache(maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+
+# Number of chunks retrieved for question answering
+QA_TOP_K = 3
+
+@lru_cache(maxsize=256)
+def source_title(source_url: str) -> str:
+    """Derive a short display title ("domain: article slug") from a source URL"""
+    try:
+        parsed = urlparse(source_url)
+        
+        # Get the path part (article name)
+        path_parts = parsed.path.strip('/').split('/')
+        if path_parts and len(path_parts) > 0:
+            # Use last part of path as title (article slug)
+            article_name = path_parts[-1].replace('-', ' ').replace('_', ' ')
+            if len(article_name) > 50:
+                article_name = article_name[:50] + "..."
+            title = f"{parsed.netloc}: {article_name}"
+        else:
+            title = parsed.netloc
+        
+        # If title is too generic, just use the domain
+        if not article_name or len(article_name) < 5:
+            title = parsed.netloc
+        
+        return title
+    except:
+        return source_url[:60] + "..." if len(source_url) > 60 else source_url
+
+# Static instructions come first and never vary, so the provider's automatic
+# prompt caching can reuse this prefix across reports
+REPORT_SYSTEM_PROMPT = """You are an expert equity research analyst preparing a comprehensive report.
+
+Create a well-structured research report with these sections:
+
+1. EXECUTIVE SUMMARY (2-3 sentences)
+2. KEY FINDINGS (3-5 bullet points)
+3. DETAILED ANALYSIS (2-3 paragraphs)
+4. IMPORTANT CONSIDERATIONS (risks, limitations)
+
+Use professional financial language. Be specific and data-driven when possible (provide numbers).
+CRITICAL: When citing sources, you MUST use the COMPLETE URL in markdown link format:
+- Correct: [Source: https://www.cnbc.com/2024/11/20/nvidia-earnings.html](https://www.cnbc.com/2024/11/20/nvidia-earnings.html)
+- Wrong: [Source 1]
+
+Every claim should cite its source with the full URL as a clickable link.
+
+Generate a comprehensive research report based on the available information."""
+
+# All per-request fields live here, with the most variable ones at the tail
+REPORT_USER_PROMPT = """Context from sources:
+{context}
+
+Company: {company_name}
+Research Intent: {research_intent}
+Question: {question}
+Key Topics: {key_topics}"""
+
+# Grounded Q&A over the retrieved chunks
+QA_SYSTEM_PROMPT = """Use the following pieces of context to answer the question at the end.
+If you don't know the answer, just say that you don't know, don't try to make up an answer.
+Cite sources with their full URL when you use them."""
+
+QA_USER_PROMPT = """Context from sources:
+{context}
+
+Question: {question}"""
+
 class SynthesisModule:
     """
     Synthesizes research into comprehensive reports with:
@@ -24,36 +95,21 @@ class SynthesisModule:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=LLM_MODEL, temperature=0.4, max_tokens=MAX_TOKENS)
+        self.llm = get_chat_model(LLM_MODEL, 0.4, MAX_TOKENS, cache=None if CACHE_REPORT_RESPONSES else False)
+        # Deterministic model for Q&A so its answers are safe to cache
+        self.qa_llm = get_chat_model(LLM_MODEL, 0, MAX_TOKENS)
         self.vector_manager = VectorStoreManager()
+        # The module is shared across sessions, so store builds and searches take turns
+        self._vector_lock = threading.Lock()
         
         self.report_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert equity research analyst preparing a comprehensive report.
-            
-            Create a well-structured research report with these sections:
-            
-            1. EXECUTIVE SUMMARY (2-3 sentences)
-            2. KEY FINDINGS (3-5 bullet points)
-            3. DETAILED ANALYSIS (2-3 paragraphs)
-            4. IMPORTANT CONSIDERATIONS (risks, limitations)
-            
-            Use professional financial language. Be specific and data-driven when possible (provide numbers).
-            CRITICAL: When citing sources, you MUST use the COMPLETE URL in markdown link format:
-            - Correct: [Source: https://www.cnbc.com/2024/11/20/nvidia-earnings.html](https://www.cnbc.com/2024/11/20/nvidia-earnings.html)
-            - Wrong: [Source 1]
-            
-            Every claim should cite its source with the full URL as a clickable link.
-            """),
-            ("user", """Company: {company_name}
-            Research Intent: {research_intent}
-            Key Topics: {key_topics}
-
-            Context from sources:
-            {context}
-
-            Question: {question}
-
-            Generate a comprehensive research report based on the available information.""")
+            ("system", REPORT_SYSTEM_PROMPT),
+            ("user", REPORT_USER_PROMPT)
+        ])
+        
+        self.qa_prompt = ChatPromptTemplate.from_messages([
+            ("system", QA_SYSTEM_PROMPT),
+            ("user", QA_USER_PROMPT)
         ])
     
     def generate_report(
@@ -61,9 +117,10 @@ class SynthesisModule:
         query_analysis: Dict, 
         documents: List[Document], 
         validation_report: Dict,
-        user_question: str
+        user_question: str,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Dict:
-        """Generate comprehensive research report"""
+        """Generate comprehensive research report (streaming report text to `on_token` if given)"""
         
         logger.log_activity(
             "Synthesis Module",
@@ -76,25 +133,25 @@ class SynthesisModule:
             return self._generate_empty_report(user_question)
         
         try:
-            # Create vector store for semantic search
-            self.vector_manager.create_vector_store(documents)
-            
-            # Retrieve relevant context
-            relevant_docs = self.vector_manager.similarity_search(user_question, k=5)
+            # Create vector store for semantic search and retrieve relevant context
+            with self._vector_lock:
+                relevant_docs = self.vector_manager.build_and_search(documents, user_question, k=5)
             context = self._format_context(relevant_docs)
             
-            # Generate report using LLM
-            chain = self.report_prompt | self.llm
-            
-            response = chain.invoke({
-                "company_name": query_analysis.get("company_name", "Unknown"),
-                "research_intent": query_analysis.get("research_intent", "General research"),
-                "key_topics": ", ".join(query_analysis.get("key_topics", [])),
-                "context": context,
-                "question": user_question
-            })
-            
-            report_content = response.content
+            # Generate report using LLM (identical prompts reuse the earlier response)
+            report_content, cached_response = self._invoke_llm(
+                self.llm,
+                self.report_prompt,
+                {
+                    "company_name": query_analysis.get("company_name", "Unknown"),
+                    "research_intent": query_analysis.get("research_intent", "General research"),
+                    "key_topics": ", ".join(query_analysis.get("key_topics", [])),
+                    "context": context,
+                    "question": user_question
+                },
+                use_cache=CACHE_REPORT_RESPONSES,
+                on_token=on_token
+            )
             
             # Extract sources properly - THIS IS THE FIX
             sources_list = self._extract_sources(documents, validation_report)
@@ -114,7 +171,8 @@ class SynthesisModule:
                     "total_sources": len(documents),
                     "trusted_sources": validation_report.get("trusted_sources", 0),
                     "analysis_depth": self._calculate_depth(documents),
-                    "sources_analyzed": [doc.metadata.get("source", "Unknown") for doc in documents]
+                    "sources_analyzed": [doc.metadata.get("source", "Unknown") for doc in documents],
+                    "cached_response": cached_response
                 }
             }
             
@@ -136,20 +194,94 @@ class SynthesisModule:
             )
             return self._generate_error_report(user_question, str(e))
     
-    def _format_context(self, documents: List[Document]) -> str:
-        """Format documents into context string with FULL URLs"""
-        context_parts = []
+    def _invoke_llm(
+        self,
+        llm,
+        prompt: ChatPromptTemplate,
+        inputs: Dict,
+        use_cache: bool = True,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Tuple[str, bool]:
+        """
+        Run the prompt through the LLM, returning (content, served_from_cache).
+        With `use_cache`, non-streamed calls are left to LangChain's global cache when one is
+        installed; everything else goes through RESPONSE_CACHE.
+        """
+        messages = prompt.format_messages(**inputs)
+        if not use_cache or (on_token is None and get_llm_cache() is not None):
+            response = self._call_llm(llm, messages, on_token)
+            self._log_cached_tokens(response)
+            return response.content, False
         
-        for idx, doc in enumerate(documents[:5]):  # Top 5 most relevant
-            source = doc.metadata.get("source", "Unknown")
-            content = doc.page_content[:400]  # First 400 chars
-            
-            context_parts.append(
-                f"[SOURCE URL: {source}]\n{content}\n"
-                f"CITE THIS SOURCE AS: [Source: {source}]({source})\n"
+        cache_key = make_cache_key(
+            llm.model_name,
+            llm.temperature,
+            llm.max_tokens,
+            *(f"{message.type}:{message.content}" for message in messages)
+        )
+        content = RESPONSE_CACHE.get(cache_key)
+        if content is not None:
+            logger.log_activity(
+                "Synthesis Module",
+                "Using cached LLM response",
+                "info",
+                "Identical prompt answered earlier"
             )
+            if on_token:
+                on_token(content)
+            return content, True
         
-        return "\n---\n".join(context_parts)
+        response = self._call_llm(llm, messages, on_token)
+        self._log_cached_tokens(response)
+        RESPONSE_CACHE.set(cache_key, response.content)
+        return response.content, False
+    
+    def _call_llm(self, llm, messages: List, on_token: Optional[Callable[[str], None]] = None):
+        """Invoke the LLM, or stream it and pass each token to `on_token`"""
+        if on_token is None:
+            return llm.invoke(messages)
+        
+        response = None
+        for chunk in llm.stream(messages):
+            if chunk.content:
+                on_token(chunk.content)
+            response = chunk if response is None else response + chunk
+        
+        if response is None:
+            raise RuntimeError("The LLM stream ended without returning a response")
+        return response
+    
+    def _log_cached_tokens(self, response):
+        """Report how much of the prompt the provider served from its prefix cache"""
+        if not logger.info_enabled:
+            return
+        
+        usage_metadata = getattr(response, "usage_metadata", None) or {}
+        cached_tokens = (usage_metadata.get("input_token_details") or {}).get("cache_read")
+        prompt_tokens = usage_metadata.get("input_tokens", 0)
+        
+        if cached_tokens is None:
+            # Fallback for responses that only carry the raw OpenAI usage block
+            usage = response.response_metadata.get("token_usage") or {}
+            cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            if cached_tokens is None:
+                return
+        
+        logger.log_activity(
+            "Synthesis Module",
+            "Prompt cache usage",
+            "info",
+            f"{cached_tokens}/{prompt_tokens} prompt tokens cached"
+        )
+    
+    def _format_context(self, documents: List[Document]) -> str:
+        """Format the (already top-k) retrieved documents into a context string with FULL URLs"""
+        return "\n---\n".join(
+            f"[SOURCE URL: {source}]\n{doc.page_content[:400]}\n"  # First 400 chars
+            f"CITE THIS SOURCE AS: [Source: {source}]({source})\n"
+            for doc, source in ((doc, doc.metadata.get("source", "Unknown")) for doc in documents)
+        )
     
     def _extract_sources(self, documents: List[Document], validation_report: Dict = None) -> List[Dict]:
         """
@@ -172,28 +304,7 @@ class SynthesisModule:
             source_url = doc.metadata.get("source", f"Unknown Source {idx + 1}")
             
             if source_url not in seen_sources:
-                # Extract article title from URL or use URL itself
-                try:
-                    from urllib.parse import urlparse
-                    parsed = urlparse(source_url)
-                    
-                    # Get the path part (article name)
-                    path_parts = parsed.path.strip('/').split('/')
-                    if path_parts and len(path_parts) > 0:
-                        # Use last part of path as title (article slug)
-                        article_name = path_parts[-1].replace('-', ' ').replace('_', ' ')
-                        if len(article_name) > 50:
-                            article_name = article_name[:50] + "..."
-                        title = f"{parsed.netloc}: {article_name}"
-                    else:
-                        title = parsed.netloc
-                    
-                    # If title is too generic, just use the domain
-                    if not article_name or len(article_name) < 5:
-                        title = parsed.netloc
-                        
-                except:
-                    title = source_url[:60] + "..." if len(source_url) > 60 else source_url
+                title = source_title(source_url)
                 
                 # Get validation info
                 validation_info = doc_scores.get(source_url, {})
@@ -282,24 +393,29 @@ Please try again or contact support if the issue persists.
             }
         }
     
-    def answer_question(self, question: str, documents: List[Document]) -> str:
-        """Answer a specific question using RAG"""
+    def answer_question(
+        self,
+        question: str,
+        documents: List[Document],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Answer a specific question using RAG (streaming the answer to `on_token` if given)"""
         try:
             if not documents:
                 return "No sources available to answer this question."
             
-            # Create vector store
-            self.vector_manager.create_vector_store(documents)
+            # Retrieve the most relevant chunks and answer in a single LLM call
+            with self._vector_lock:
+                relevant_docs = self.vector_manager.build_and_search(documents, question, k=QA_TOP_K)
             
-            # Create QA chain
-            qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vector_manager.vector_store.as_retriever(search_kwargs={"k": 3})
+            # Temperature 0, so the same question over the same context is safe to cache
+            answer, _ = self._invoke_llm(
+                self.qa_llm,
+                self.qa_prompt,
+                {"context": self._format_context(relevant_docs), "question": question},
+                on_token=on_token
             )
-            
-            result = qa_chain.invoke({"query": question})
-            return result.get("result", "Unable to generate answer.")
+            return answer or "Unable to generate answer."
             
         except Exception as e:
             logger.log_activity(
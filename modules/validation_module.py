@@ -1,16 +1,39 @@
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from typing import List, Dict, Tuple
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema import Document
 import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from config import LLM_MODEL, LLM_TEMPERATURE, PRIORITY_DOMAINS, MIN_CONFIDENCE_SCORE
+from config import (
+    LLM_MODEL, LLM_TEMPERATURE, MIN_CONFIDENCE_SCORE,
+    ENABLE_LLM_VALIDATION, MAX_VALIDATION_WORKERS, VALIDATION_BATCH_SIZE,
+    VALIDATION_CACHE_SIZE, LLM_CACHE_TTL
+)
 from utils.logger import logger
+from utils.llm import get_chat_model
+from utils.cache import TTLCache
+from utils.urls import is_priority_domain
+
+# Finance vocabulary that signals substantive content; one case-insensitive scan per document
+FINANCE_KEYWORDS_RE = re.compile(r"earnings|revenue|profit|quarter|fiscal", re.IGNORECASE)
+
+# LLM credibility scores keyed by (source, hash of the content the model saw)
+VALIDATION_CACHE = TTLCache(maxsize=VALIDATION_CACHE_SIZE, ttl=LLM_CACHE_TTL)
+
+# Heuristic score for every combination of (trusted source, long content, finance keywords),
+# indexed by the bitmask trusted << 2 | long << 1 | keywords
+HEURISTIC_SCORES = tuple(
+    min(50 + 30 * (mask >> 2 & 1) + 10 * (mask >> 1 & 1) + 10 * (mask & 1), 100)
+    for mask in range(8)
+)
+HEURISTIC_REASON = "Heuristic evaluation based on source quality and content depth"
+
+# One "[n] SCORE: .. | REASON: .." line per document in a batched LLM response
+BATCH_LINE_RE = re.compile(r"^\s*\[(\d+)\]\s*(.+)$", re.MULTILINE)
+SCORE_RE = re.compile(r'SCORE:\s*(\d+)')
+REASON_RE = re.compile(r'REASON:\s*(.+)')
 
 class ValidationModule:
     """
@@ -22,10 +45,11 @@ class ValidationModule:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(model=LLM_MODEL, temperature=0.1)  # Low temp for consistency
+        # Low temp for consistency; scores are cached (with a TTL) in VALIDATION_CACHE only
+        self.llm = get_chat_model(LLM_MODEL, 0.1, cache=False)
         self.credibility_prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a fact-checker for financial research.
-            Evaluate the credibility of this information on a scale of 0-100.
+            Evaluate the credibility of each numbered document on a scale of 0-100.
             
             Consider:
             - Source authority and reputation
@@ -33,10 +57,10 @@ class ValidationModule:
             - Presence of citations/data
             - Consistency with known facts
             
-            Respond with just the score (0-100) and a brief reason (one sentence).
-            Format: SCORE: 85 | REASON: Recent data from reputable source with citations
+            Respond with one line per document: its number, the score (0-100) and a brief reason (one sentence).
+            Format: [1] SCORE: 85 | REASON: Recent data from reputable source with citations
             """),
-            ("user", "Source: {source}\n\nContent: {content}")
+            ("user", "{documents}")
         ])
     
     def validate_documents(self, documents: List[Document]) -> Dict:
@@ -49,6 +73,26 @@ class ValidationModule:
         )
         
         if not documents:
+            return self.summarize([])
+        
+        if ENABLE_LLM_VALIDATION:
+            validation_results = self._evaluate_with_llm(documents)
+        else:
+            validation_results = [self._evaluate_one(item) for item in enumerate(documents)]
+        
+        return self.summarize(validation_results)
+    
+    def validate_document(self, doc: Document, idx: int = 0) -> Dict:
+        """Score a single document heuristically; cheap enough to run inline as each document loads"""
+        return self._evaluate_one((idx, doc))
+    
+    def validate_batch(self, documents: List[Document]) -> List[Dict]:
+        """Score up to VALIDATION_BATCH_SIZE documents in one LLM call; safe to run on a worker thread"""
+        return self._evaluate_with_llm(documents)
+    
+    def summarize(self, validation_results: List[Dict]) -> Dict:
+        """Build the validation report from per-document results"""
+        if not validation_results:
             return {
                 "overall_confidence": 0,
                 "document_scores": [],
@@ -56,32 +100,11 @@ class ValidationModule:
                 "trusted_sources": 0
             }
         
-        validation_results = []
-        
-        for idx, doc in enumerate(documents):
-            score, reason = self._evaluate_document(doc)
-            
-            validation_results.append({
-                "doc_index": idx,
-                "source": doc.metadata.get("source", "Unknown"),
-                "credibility_score": score,
-                "reason": reason,
-                "is_trusted": self._is_trusted_source(doc.metadata.get("source", ""))
-            })
-            
-            status = "success" if score >= 70 else "warning" if score >= 50 else "error"
-            logger.log_activity(
-                "Validation Module",
-                f"Document {idx + 1} validated",
-                status,
-                f"Score: {score}/100 - {reason[:50]}..."
-            )
-        
         # Calculate overall confidence
         avg_score = sum(r["credibility_score"] for r in validation_results) / len(validation_results)
         trusted_count = sum(1 for r in validation_results if r["is_trusted"])
         
-        overall_confidence = self._calculate_overall_confidence(avg_score, trusted_count, len(documents))
+        overall_confidence = self._calculate_overall_confidence(avg_score, trusted_count, len(validation_results))
         
         report = {
             "overall_confidence": round(overall_confidence, 2),
@@ -90,60 +113,123 @@ class ValidationModule:
             "trusted_sources": trusted_count
         }
         
+        # One summary entry (logged from the calling thread) instead of one per document
+        scores = ", ".join(f"#{r['doc_index'] + 1}: {r['credibility_score']}" for r in validation_results)
         logger.log_activity(
             "Validation Module",
             "Validation complete",
             "success",
-            f"Overall confidence: {overall_confidence:.1f}%"
+            f"Overall confidence: {overall_confidence:.1f}% | Scores: {scores}"
         )
         
         return report
     
-    def _evaluate_document(self, doc: Document) -> Tuple[int, str]:
-        """Evaluate a single document's credibility"""
+    def _evaluate_one(self, item: Tuple[int, Document]) -> Dict:
+        """Score one (index, document) pair; safe to run on a worker thread"""
+        idx, doc = item
+        is_trusted = self._is_trusted_source(doc.metadata.get("source", ""))
+        score, reason = self._evaluate_document(doc, is_trusted)
+        return self._build_result(idx, doc, score, reason, is_trusted)
+    
+    def _build_result(self, idx: int, doc: Document, score: int, reason: str, is_trusted: bool) -> Dict:
+        """Shape a per-document validation result"""
+        return {
+            "doc_index": idx,
+            "source": doc.metadata.get("source", "Unknown"),
+            "credibility_score": score,
+            "reason": reason,
+            "is_trusted": is_trusted
+        }
+    
+    def _evaluate_with_llm(self, documents: List[Document]) -> List[Dict]:
+        """Score documents with one LLM call per batch, reusing cached scores for unchanged documents"""
+        results = {}
+        items = []
+        keys = {}
+        for idx, doc in enumerate(documents):
+            key = self._validation_cache_key(doc)
+            cached = VALIDATION_CACHE.get(key)
+            if cached is not None:
+                score, reason = cached
+                is_trusted = self._is_trusted_source(doc.metadata.get("source", ""))
+                results[idx] = self._build_result(idx, doc, score, reason, is_trusted)
+            else:
+                keys[idx] = key
+                items.append((idx, doc))
+        
+        batches = [items[i:i + VALIDATION_BATCH_SIZE] for i in range(0, len(items), VALIDATION_BATCH_SIZE)]
+        if len(batches) == 1:
+            scored = [self._evaluate_batch(batches[0])]
+        elif batches:
+            with ThreadPoolExecutor(max_workers=min(MAX_VALIDATION_WORKERS, len(batches))) as executor:
+                scored = list(executor.map(self._evaluate_batch, batches))
+        else:
+            scored = []
+        
+        for batch_results in scored:
+            for result, from_llm in batch_results:
+                results[result["doc_index"]] = result
+                if from_llm:
+                    VALIDATION_CACHE.set(keys[result["doc_index"]], (result["credibility_score"], result["reason"]))
+        
+        return [results[idx] for idx in range(len(documents))]
+    
+    def _validation_cache_key(self, doc: Document) -> Tuple[str, str]:
+        """Key a document by source and the content preview sent to the LLM"""
+        content_hash = hashlib.sha1(doc.page_content[:500].encode("utf-8")).hexdigest()
+        return doc.metadata.get("source", ""), content_hash
+    
+    def _evaluate_batch(self, batch: List[Tuple[int, Document]]) -> List[Tuple[Dict, bool]]:
+        """
+        Score a batch of (index, document) pairs in a single LLM call; safe to run on a worker thread.
+        Returns (result, scored_by_llm) pairs.
+        """
+        prompt_items = "\n\n".join(
+            f"[{number}] Source: {doc.metadata.get('source', 'Unknown')}\nContent: {doc.page_content[:500]}"
+            for number, (_, doc) in enumerate(batch, 1)
+        )
+        
         try:
-            source = doc.metadata.get("source", "Unknown")
-            content_preview = doc.page_content[:500]  # First 500 chars
-            
-            # Quick heuristic evaluation (faster than LLM call)
-            base_score = 50
-            
-            # Source quality
-            if self._is_trusted_source(source):
-                base_score += 30
-            
-            # Content quality indicators
-            if len(doc.page_content) > 500:
-                base_score += 10
-            
-            if any(keyword in doc.page_content.lower() for keyword in 
-                   ['earnings', 'revenue', 'profit', 'quarter', 'fiscal']):
-                base_score += 10
-            
-            # validation for edge cases 
-            # chain = self.credibility_prompt | self.llm
-            # response = chain.invoke({"source": source, "content": content_preview})
-            # score, reason = self._parse_validation_response(response.content)
+            response = self.llm.invoke(self.credibility_prompt.format_messages(documents=prompt_items))
+            lines = {int(number): line for number, line in BATCH_LINE_RE.findall(response.content)}
+        except Exception:
+            lines = {}
+        
+        results = []
+        for number, (idx, doc) in enumerate(batch, 1):
+            line = lines.get(number)
+            if line is None:
+                # Model skipped this document (or the call failed), fall back to heuristics
+                results.append((self._evaluate_one((idx, doc)), False))
+                continue
             
-            reason = "Heuristic evaluation based on source quality and content depth"
-            score = min(base_score, 100)
+            score, reason = self._parse_validation_response(line)
+            is_trusted = self._is_trusted_source(doc.metadata.get("source", ""))
+            results.append((self._build_result(idx, doc, max(0, min(score, 100)), reason, is_trusted), True))
+        
+        return results
+    
+    def _evaluate_document(self, doc: Document, is_trusted: bool) -> Tuple[int, str]:
+        """Evaluate a single document's credibility heuristically (must not log)"""
+        try:
+            # Quick heuristic evaluation (faster than LLM call): source quality and
+            # content quality indicators form a bitmask into the precomputed score table
+            signals = (
+                is_trusted << 2
+                | (len(doc.page_content) > 500) << 1
+                | (FINANCE_KEYWORDS_RE.search(doc.page_content) is not None)
+            )
             
-            return score, reason
+            return HEURISTIC_SCORES[signals], HEURISTIC_REASON
             
         except Exception as e:
-            logger.log_activity(
-                "Validation Module",
-                "Evaluation error",
-                "warning",
-                str(e)
-            )
-            return 50, "Default score due to evaluation error"
+            return 50, f"Default score due to evaluation error: {str(e)}"
     
     def _parse_validation_response(self, response: str) -> Tuple[int, str]:
         """Parse LLM validation response"""
         try:
-            score_match = re.search(r'SCORE:\s*(\d+)', response)
-            reason_match = re.search(r'REASON:\s*(.+)', response)
+            score_match = SCORE_RE.search(response)
+            reason_match = REASON_RE.search(response)
             
             score = int(score_match.group(1)) if score_match else 50
             reason = reason_match.group(1).strip() if reason_match else "No reason provided"
@@ -154,8 +240,7 @@ class ValidationModule:
     
     def _is_trusted_source(self, source: str) -> bool:
         """Check if source is from a trusted domain"""
-        source_lower = source.lower()
-        return any(domain in source_lower for domain in PRIORITY_DOMAINS)
+        return is_priority_domain(source)
     
     def _calculate_overall_confidence(self, avg_score: float, trusted_count: int, total_docs: int) -> float:
         """Calculate overall confidence score"""
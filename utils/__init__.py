@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Make the project root (config.py, sibling packages) importable exactly once
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _root not in sys.path:
+    sys.path.append(_root)
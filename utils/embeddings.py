@@ -1,54 +1,214 @@
 import os
+import shutil
+import hashlib
+import threading
 from typing import List
-from langchain_openai import OpenAIEmbeddings
+from concurrent.futures import ThreadPoolExecutor
+import faiss
+import numpy as np
 from langchain_community.vectorstores import FAISS
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain.schema import Document
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import CHUNK_SIZE, CHUNK_OVERLAP, VECTOR_STORE_PATH
+from config import (
+    CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_BATCH_SIZE, VECTOR_STORE_PATH, QUERY_EMBEDDING_CACHE_SIZE,
+    VECTOR_QUANTIZATION, QUANTIZATION_MIN_VECTORS, PERSIST_VECTOR_STORES, MAX_PERSISTED_VECTOR_STORES,
+    HNSW_MIN_VECTORS, HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH
+)
+from utils.cache import TTLCache, make_cache_key
+from utils.llm import get_embeddings
+from utils.text_splitter import FastTextSplitter
+
+# Query embeddings are deterministic for a given text, so they can live for the whole session
+QUERY_EMBEDDING_CACHE = TTLCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE, ttl=24 * 60 * 60)
+
+# OpenAI embeddings are unit length, so inner product equals cosine similarity
+# and FAISS can use its flat inner-product index
+DISTANCE_STRATEGY = DistanceStrategy.MAX_INNER_PRODUCT
+
+# Serializes background saves and pruning of VECTOR_STORE_PATH
+PERSIST_LOCK = threading.Lock()
 
 class VectorStoreManager:
     """Manages vector store operations"""
     
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings()
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.embeddings = get_embeddings(EMBEDDING_BATCH_SIZE)
+        self.text_splitter = FastTextSplitter(
             separators=['\n\n', '\n', '.', ',', ' '],
             chunk_size=CHUNK_SIZE,
             chunk_overlap=CHUNK_OVERLAP
         )
         self.vector_store = None
+        self._doc_set_hash = None
     
     def create_vector_store(self, documents: List[Document]) -> FAISS:
-        """Create a new vector store from documents"""
+        """Create a new vector store from documents (reused if the documents are unchanged)"""
         try:
+            doc_set_hash = self._hash_documents(documents)
+            if self.vector_store is not None and doc_set_hash == self._doc_set_hash:
+                return self.vector_store
+            
+            # Same documents indexed in an earlier session: load instead of re-embedding
+            store_path = self._store_path(doc_set_hash)
+            if PERSIST_VECTOR_STORES and self.load_local(store_path) is not None:
+                self._doc_set_hash = doc_set_hash
+                # Mark as recently used so pruning keeps it
+                try:
+                    os.utime(store_path)
+                except OSError:
+                    pass
+                return self.vector_store
+            
             # Split documents
-            split_docs = self.text_splitter.split_documents(documents)
+            split_docs = self._dedupe_chunks(self.text_splitter.split_documents(documents))
+            texts = [doc.page_content for doc in split_docs]
+            
+            # Embed every chunk in one batched request, then build the index from the vectors
+            vectors = self.embeddings.embed_documents(texts)
+            self.vector_store = self._new_store(vectors)
+            self.vector_store.add_embeddings(
+                list(zip(texts, vectors)),
+                metadatas=[doc.metadata for doc in split_docs]
+            )
+            self._doc_set_hash = doc_set_hash
             
-            # Create vector store
-            self.vector_store = FAISS.from_documents(split_docs, self.embeddings)
+            if PERSIST_VECTOR_STORES:
+                # Written in the background so the report does not wait on disk
+                threading.Thread(
+                    target=self._persist_store,
+                    args=(self.vector_store, store_path),
+                    daemon=True
+                ).start()
             return self.vector_store
         except Exception as e:
             raise Exception(f"Error creating vector store: {str(e)}")
     
+    def _persist_store(self, store: FAISS, path: str):
+        """Save a store, then drop the least recently used ones beyond the cap (runs in a worker thread)"""
+        with PERSIST_LOCK:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                store.save_local(path)
+                self._prune_stores()
+            except Exception as e:
+                print(f"Error persisting vector store: {str(e)}")
+    
+    def _prune_stores(self):
+        """Delete the oldest persisted stores so at most MAX_PERSISTED_VECTOR_STORES remain"""
+        entries = [entry for entry in os.scandir(VECTOR_STORE_PATH) if entry.is_dir()]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in entries[MAX_PERSISTED_VECTOR_STORES:]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    
+    def _store_path(self, doc_set_hash: str) -> str:
+        """Content-addressed location for a persisted store of this document set"""
+        key = make_cache_key(doc_set_hash, self.embeddings.model, VECTOR_QUANTIZATION)
+        return os.path.join(VECTOR_STORE_PATH, key[:16])
+    
+    def _new_store(self, vectors: List[List[float]]) -> FAISS:
+        """Create an empty store whose index suits the number of vectors"""
+        dimension = len(vectors[0])
+        quantize = VECTOR_QUANTIZATION == "int8" and len(vectors) >= QUANTIZATION_MIN_VECTORS
+        
+        if len(vectors) >= HNSW_MIN_VECTORS:
+            # Graph index: roughly logarithmic search instead of scanning every vector
+            if quantize:
+                index = faiss.IndexHNSWSQ(
+                    dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT
+                )
+            else:
+                index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif quantize:
+            # 8-bit scalar quantization: a quarter of the memory scanned per query
+            index = faiss.IndexScalarQuantizer(
+                dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.IndexFlatIP(dimension)
+        
+        if quantize:
+            index.train(np.asarray(vectors, dtype="float32"))
+        
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            distance_strategy=DISTANCE_STRATEGY
+        )
+    
+    def _hash_documents(self, documents: List[Document]) -> str:
+        """Fingerprint a document set by source and content, independent of order"""
+        digests = sorted(
+            hashlib.sha256(
+                f"{doc.metadata.get('source', '')}\x1f{doc.page_content}".encode("utf-8")
+            ).digest()
+            for doc in documents
+        )
+        return hashlib.sha256(b"".join(digests)).hexdigest()
+    
+    def _dedupe_chunks(self, documents: List[Document]) -> List[Document]:
+        """Drop chunks whose text was already seen so each is embedded only once"""
+        unique = {}
+        for doc in documents:
+            unique.setdefault(doc.page_content, doc)
+        return list(unique.values())
+    
     def add_documents(self, documents: List[Document]):
         """Add documents to existing vector store"""
         try:
-            split_docs = self.text_splitter.split_documents(documents)
+            split_docs = self._dedupe_chunks(self.text_splitter.split_documents(documents))
+            if not split_docs:
+                return
+            texts = [doc.page_content for doc in split_docs]
+            
+            # Same single batched embedding request as create_vector_store
+            vectors = self.embeddings.embed_documents(texts)
             if self.vector_store is None:
-                self.vector_store = FAISS.from_documents(split_docs, self.embeddings)
-            else:
-                self.vector_store.add_documents(split_docs)
+                self.vector_store = self._new_store(vectors)
+            self.vector_store.add_embeddings(
+                list(zip(texts, vectors)),
+                metadatas=[doc.metadata for doc in split_docs]
+            )
+            self._doc_set_hash = None
         except Exception as e:
             raise Exception(f"Error adding documents: {str(e)}")
     
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, reusing the vector if the same text was embedded before"""
+        vector = QUERY_EMBEDDING_CACHE.get(query)
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+            QUERY_EMBEDDING_CACHE.set(query, vector)
+        return vector
+    
     def similarity_search(self, query: str, k: int = 4) -> List[Document]:
         """Search for similar documents"""
         if self.vector_store is None:
             return []
         try:
-            return self.vector_store.similarity_search(query, k=k)
+            return self.similarity_search_by_vector(self.embed_query(query), k=k)
+        except Exception as e:
+            print(f"Search error: {str(e)}")
+            return []
+    
+    def build_and_search(self, documents: List[Document], query: str, k: int = 4) -> List[Document]:
+        """Build (or reuse) the store for `documents` and search it, embedding the query during the build"""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            query_future = executor.submit(self.embed_query, query)
+            self.create_vector_store(documents)
+            query_vector = query_future.result()
+        return self.similarity_search_by_vector(query_vector, k=k)
+    
+    def similarity_search_by_vector(self, query_vector: List[float], k: int = 4) -> List[Document]:
+        """Search for documents similar to an already embedded query"""
+        if self.vector_store is None:
+            return []
+        try:
+            return self.vector_store.similarity_search_by_vector(query_vector, k=k)
         except Exception as e:
             print(f"Search error: {str(e)}")
             return []
@@ -69,8 +229,10 @@ class VectorStoreManager:
                 self.vector_store = FAISS.load_local(
                     path, 
                     self.embeddings,
-                    allow_dangerous_deserialization=True
+                    allow_dangerous_deserialization=True,
+                    distance_strategy=DISTANCE_STRATEGY
                 )
+                self._doc_set_hash = None
                 return self.vector_store
         except Exception as e:
             print(f"Error loading vector store: {str(e)}")
@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import Optional
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+@lru_cache(maxsize=8)
+def get_chat_model(
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int] = None,
+    json_mode: bool = False,
+    cache: Optional[bool] = None
+) -> ChatOpenAI:
+    """
+    Return a shared chat model so HTTP clients stay warm across module instances.
+    `cache=False` opts the model out of the global LangChain cache; None uses it when one is set.
+    """
+    model_kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        model_kwargs=model_kwargs,
+        cache=cache,
+        # Streamed responses carry token usage (including prefix-cache hits) in their last chunk
+        stream_usage=True
+    )
+
+@lru_cache(maxsize=2)
+def get_embeddings(chunk_size: int = 1000) -> OpenAIEmbeddings:
+    """Return the shared embeddings client, sending up to `chunk_size` texts per request"""
+    return OpenAIEmbeddings(chunk_size=chunk_size)
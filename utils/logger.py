@@ -1,46 +1,81 @@
 import streamlit as st
+from collections import deque
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import json
+from config import LOG_LEVEL, MAX_LOG_ENTRIES
+
+# Statuses in increasing severity; anything below LOG_LEVEL is dropped
+LOG_LEVELS = {"info": 0, "success": 1, "warning": 2, "error": 3}
 
 class ModuleLogger:
     """Tracks and displays Module activities in real-time"""
     
     def __init__(self):
-        if 'activity_log' not in st.session_state:
-            st.session_state.activity_log = []
+        self._entries()
+        self.min_level = LOG_LEVELS.get(LOG_LEVEL, 0)
+        # Checked at hot call sites to skip building messages that would be dropped
+        self.info_enabled = self.min_level <= LOG_LEVELS["info"]
     
     def log_activity(self, module_name: str, action: str, status: str = "info", details: str = ""):
         """Log an module activity"""
-        log_entry = {
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
+        if LOG_LEVELS.get(status, 0) < self.min_level:
+            return None
+        log_entry = self._build_entry(module_name, action, status, details)
+        self._entries().appendleft(log_entry)
+        return log_entry
+    
+    def log_activities(self, entries: List[Tuple[str, str, str, str]]) -> List[Dict]:
+        """Log several (module, action, status, details) activities in one session-state update"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        log_entries = [
+            self._build_entry(*entry, timestamp=timestamp)
+            for entry in entries
+            if LOG_LEVELS.get(entry[2], 0) >= self.min_level
+        ]
+        # extendleft reverses the batch, keeping the log newest first
+        self._entries().extendleft(log_entries)
+        return log_entries
+    
+    def _entries(self) -> deque:
+        """This session's log, newest first and bounded to MAX_LOG_ENTRIES"""
+        log = st.session_state.get('activity_log')
+        if log is None:
+            st.session_state.activity_log = log = deque(maxlen=MAX_LOG_ENTRIES)
+        elif not isinstance(log, deque):
+            # Sessions started before the deque kept an oldest-first list
+            st.session_state.activity_log = log = deque(reversed(log), maxlen=MAX_LOG_ENTRIES)
+        return log
+    
+    def _build_entry(self, module_name: str, action: str, status: str, details: str, timestamp: str = None) -> Dict:
+        """Create a log record"""
+        return {
+            "timestamp": timestamp or datetime.now().strftime("%H:%M:%S"),
             "module": module_name,
             "action": action,
             "status": status,  # info, success, warning, error
             "details": details
         }
-        st.session_state.activity_log.append(log_entry)
-        return log_entry
     
     def get_logs(self) -> List[Dict]:
-        """Retrieve all logs"""
-        return st.session_state.activity_log
+        """Retrieve all logs (newest first)"""
+        return list(self._entries())
     
     def clear_logs(self):
         """Clear all logs"""
-        st.session_state.activity_log = []
+        self._entries().clear()
     
     def display_logs(self, container=None):
         """Display logs in Streamlit UI"""
         if container is None:
             container = st
         
-        logs = self.get_logs()
+        logs = self._entries()
         if not logs:
             container.info("No activities yet. Start a research query!")
             return
         
-        for log in reversed(logs):  
+        for log in logs:
             status_emoji = {
                 "info": "ℹ️",
                 "success": "✅",
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import deque
+
+class RateLimiter:
+    """Thread-safe sliding-window limiter allowing `max_calls` per `period` seconds"""
+
+    def __init__(self, max_calls: int, period: float = 1.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed, then record it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+
+                wait = self.period - (now - self._calls[0])
+            time.sleep(wait)
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by at least `min_interval` seconds"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str):
+        """Reserve the host's next free slot and sleep until it arrives"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+
+            # Forget hosts whose slots have passed so the map stays small
+            if len(self._next_slot) > 256:
+                self._next_slot = {h: t for h, t in self._next_slot.items() if t > now}
+
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,64 @@
+from typing import List, Sequence
+from langchain.schema import Document
+
+DEFAULT_SEPARATORS = ('\n\n', '\n', '.', ',', ' ')
+
+class FastTextSplitter:
+    """
+    Greedy single-pass splitter with the same knobs as RecursiveCharacterTextSplitter.
+    Each chunk is cut at the last separator (in priority order) that keeps it at
+    least half full, found with str.rfind instead of recursive re-splitting.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        separators: Sequence[str] = DEFAULT_SEPARATORS
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(separators)
+        # Cutting earlier than this would leave many undersized chunks
+        self.min_chunk = max(chunk_size // 2, chunk_overlap + 1)
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into overlapping chunks of at most chunk_size characters"""
+        chunks = []
+        start = 0
+        length = len(text)
+
+        while start < length:
+            end = min(start + self.chunk_size, length)
+
+            if end < length:
+                for separator in self.separators:
+                    position = text.rfind(separator, start + self.min_chunk, end)
+                    if position != -1:
+                        end = position + len(separator)
+                        break
+
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= length:
+                break
+
+            # Step back for the overlap, starting the next chunk on a word boundary
+            next_start = end - self.chunk_overlap
+            space = text.find(' ', next_start, end)
+            if space != -1:
+                next_start = space + 1
+            start = max(next_start, start + 1)
+
+        return chunks
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """Split documents into chunks that keep a copy of their source metadata"""
+        return [
+            Document(page_content=chunk, metadata=dict(doc.metadata))
+            for doc in documents
+            for chunk in self.split_text(doc.page_content)
+        ]
@@ -0,0 +1,71 @@
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config import PRIORITY_DOMAINS
+
+DomainIndex = Dict[str, Tuple[str, ...]]
+
+# Index value for domains listed without a path
+ANY_PATH = ("",)
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = frozenset({"gclid", "fbclid", "mc_cid", "mc_eid", "ocid", "guccounter"})
+
+def build_domain_index(domains: Iterable[str]) -> DomainIndex:
+    """
+    Index domains by hostname so URLs can be matched with dict lookups
+    instead of substring scans. Entries may include a path
+    (e.g. "yahoo.com/finance"), which is kept as a required path prefix.
+    """
+    index = {}
+    for domain in domains:
+        # Lowercased once here so lookups never re-lower the constants
+        host, _, path = domain.strip().lower().partition("/")
+        index.setdefault(host, set()).add("/" + path if path else "")
+    # A bare host entry matches every path, so it makes any prefixes redundant
+    return {
+        host: ANY_PATH if "" in prefixes else tuple(prefixes)
+        for host, prefixes in index.items()
+    }
+
+# Built once at import; shared by research (ranking) and validation (trust)
+PRIORITY_DOMAIN_INDEX = build_domain_index(PRIORITY_DOMAINS)
+
+def domain_matches(host: str, path: str, index: DomainIndex) -> bool:
+    """Check a parsed (lowercase) host and path against the index, including parent domains"""
+    candidate = host
+    while candidate:
+        prefixes = index.get(candidate)
+        if prefixes is not None and (prefixes is ANY_PATH or path.lower().startswith(prefixes)):
+            return True
+        _, _, candidate = candidate.partition(".")
+    return False
+
+def matches_domain(url: str, index: DomainIndex) -> bool:
+    """Check whether a URL belongs to one of the indexed domains"""
+    parsed = urlsplit(url)
+    return domain_matches(parsed.hostname or "", parsed.path, index)
+
+def is_priority_domain(url: str) -> bool:
+    """Check whether a URL comes from one of the trusted financial sources in PRIORITY_DOMAINS"""
+    try:
+        return matches_domain(url, PRIORITY_DOMAIN_INDEX)
+    except ValueError:
+        return False
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivial variants (tracking params, trailing slash, fragment) compare equal"""
+    parts = urlsplit(url.strip())
+    
+    query = parts.query
+    if query:
+        params = parse_qsl(query, keep_blank_values=True)
+        kept = [
+            (key, value) for key, value in params
+            if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+        ]
+        if len(kept) != len(params):
+            query = urlencode(kept)
+    
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))